@@ -36,14 +36,22 @@ kbd.fit(np.clip(measured_data, xmin, xmax).reshape(-1, 1))
 bin_edges = kbd.bin_edges_[0].tolist()
 binning = np.array([-np.inf] + bin_edges + [np.inf])  # under/over-flow bins
 
+# Find bin indices with binary search (faster than np.histogram/np.histogram2d digitization)
+num_bins = len(binning) - 1
+reco_mc_idx = np.searchsorted(binning, reco_mc_data, side="right") - 1
+truth_mc_idx = np.searchsorted(binning, truth_mc_data, side="right") - 1
+truth_idx = np.searchsorted(binning, truth_data, side="right") - 1
+measured_idx = np.searchsorted(binning, measured_data, side="right") - 1
+
 # Build and normalize response matrix using Monte Carlo
-response, _, _ = np.histogram2d(reco_mc_data, truth_mc_data[eff_mask_mc], bins=binning)
-truth_mc, _ = np.histogram(truth_mc_data, bins=binning)
+response = np.bincount(reco_mc_idx * num_bins + truth_mc_idx[eff_mask_mc], minlength=num_bins**2)
+response = response.reshape(num_bins, num_bins).astype(float)
+truth_mc = np.bincount(truth_mc_idx, minlength=num_bins)
 response = normalize_response(response, truth_mc=truth_mc)
 
 # Define truth and measured histogram
-truth, _ = np.histogram(truth_data, bins=binning)
-measured, _ = np.histogram(measured_data, bins=binning)
+truth = np.bincount(truth_idx, minlength=num_bins)
+measured = np.bincount(measured_idx, minlength=num_bins)
 
 # Find optimal value for regularization parameter lambda
 lam = lambda_optimizer(response=response, measured=measured, truth=truth_mc, binning=binning, num_reps=20, seed=seed)
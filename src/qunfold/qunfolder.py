@@ -1,11 +1,12 @@
 import os
 import sys
+import functools
 import numpy as np
 import scipy as sp
 import dimod
 import minorminer
 from tqdm import tqdm
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from dwave.samplers import SimulatedAnnealingSampler
 from dwave.samplers import SteepestDescentSolver
 from dwave.system import LeapHybridCQMSampler
@@ -18,14 +19,50 @@ except ImportError:
     pass
 
 
+_toy_unfolder = None
+
+
+def _init_toy_worker(unfolder):
+    global _toy_unfolder
+    _toy_unfolder = unfolder
+
+
+def _run_toy_worker(toy_seed, **kwargs):
+    return _toy_unfolder._run_toy(toy_seed, **kwargs)
+
+
 class QUnfolder:
-    def __init__(self, response, measured, binning, lam=0.0):
+    _shared_cache = ("_efficiency", "_response_matrix", "_response_gram", "_laplacian_gram")
+
+    def __init__(self, response, measured, binning, lam=0.0, encoding="binary"):
+        if encoding not in ("binary", "unary"):
+            raise ValueError(f"Unknown encoding '{encoding}': use 'binary' or 'unary'")
         self.R = response
         self.d = measured
         self.binning = binning
         self.lam = lam
+        self.encoding = encoding
         self.sol_pick = "lowest-energy"
 
+    @property
+    def R(self):
+        return self._R
+
+    @R.setter
+    def R(self, response):
+        self._R = response
+        for key in ("_efficiency", "_response_matrix", "_response_gram"):
+            self.__dict__.pop(key, None)
+
+    @property
+    def binning(self):
+        return self._binning
+
+    @binning.setter
+    def binning(self, binning):
+        self._binning = binning
+        self.__dict__.pop("_laplacian_gram", None)
+
     @property
     def num_bins(self):
         return len(self.d)
@@ -38,81 +75,97 @@ class QUnfolder:
     def num_physical_qubits(self):
         return sum(len(chain) for chain in self.graph_embedding.values())
 
-    @property
-    def num_bits(self):
+    @functools.cached_property
+    def _efficiency(self):
         eff = np.sum(self.R, axis=0)
         eff[np.isclose(eff, 0)] = 1
-        exp = np.ceil(self.d / eff)
-        return [(int(np.ceil(np.log2(x * 1.2))) if x else 1) for x in exp]
+        return eff
+
+    @functools.cached_property
+    def _response_matrix(self):
+        # smearing is localized within a few bins, so R is often near-diagonal
+        if np.count_nonzero(self.R) < 0.2 * self.R.size:
+            return sp.sparse.csr_array(self.R)
+        return self.R
+
+    @functools.cached_property
+    def _response_gram(self):
+        R = self._response_matrix
+        RtR = R.T @ R
+        return RtR.toarray() if sp.sparse.issparse(RtR) else RtR
+
+    @functools.cached_property
+    def _laplacian_gram(self):
+        L = sp.sparse.csr_array(self._get_laplacian())
+        return (L.T @ L).toarray()
+
+    @property
+    def num_bits(self):
+        exp = np.ceil(self.d / self._efficiency)
+        if self.encoding == "unary":
+            return np.where(exp > 0, np.ceil(exp * 1.2), 1).astype(int)
+        return np.where(exp > 0, np.ceil(np.log2(np.maximum(exp, 1) * 1.2)), 1).astype(int)
 
     @property
     def precision_vectors(self):
-        num_bits = self.num_bits
-        pvecs = [2 ** np.arange(num_bits[i]) for i in range(self.num_bins)]
+        if self.encoding == "unary":
+            return [np.ones(nb, dtype=int) for nb in self.num_bits]
+        pvecs = [2 ** np.arange(nb) for nb in self.num_bits]
         return pvecs
 
+    @property
+    def upper_bounds(self):
+        return [int(np.sum(pvec)) for pvec in self.precision_vectors]
+
     @property
     def linear_coeffs(self):
-        return -2 * (self.R.T @ self.d)
+        return -2 * (self._response_matrix.T @ self.d)
 
     @property
     def quadratic_coeffs(self):
-        L = self._get_laplacian()
-        return (self.R.T @ self.R) + self.lam * (L.T @ L)
+        return self._response_gram + self.lam * self._laplacian_gram
 
     def _get_laplacian(self):
         x = (self.binning[:-1] + self.binning[1:]) / 2
         n = len(x)
         L = np.zeros(shape=(n, n))
-        for i in range(1, n - 1):
-            h1 = x[i] - x[i - 1]
-            h2 = x[i + 1] - x[i]
-            L[i, i - 1] = 2 / (h1 * (h1 + h2))
-            L[i, i] = -2 / (h1 * h2)
-            L[i, i + 1] = 2 / (h2 * (h1 + h2))
+        i = np.arange(1, n - 1)
+        h1 = x[1:-1] - x[:-2]
+        h2 = x[2:] - x[1:-1]
+        L[i, i - 1] = 2 / (h1 * (h1 + h2))
+        L[i, i] = -2 / (h1 * h2)
+        L[i, i + 1] = 2 / (h2 * (h1 + h2))
         L[0, :] = L[1, :]
         L[-1, :] = L[-2, :]
         L = 2 * L / np.max(np.abs(L))
         return L
 
+    @property
+    def precision_matrix(self):
+        pvecs = self.precision_vectors
+        return sp.linalg.block_diag(*[pvec[np.newaxis, :] for pvec in pvecs])
+
     def _get_qubo_matrix(self):
-        dim = self.num_bins
         a = self.linear_coeffs
         B = self.quadratic_coeffs
-        pvecs = self.precision_vectors
-        linear_blocks = [a[i] * np.diag(pvecs[i]) for i in range(dim)]
-        quadratic_blocks = [[B[i, j] * np.outer(pvecs[i], pvecs[j]) for j in range(dim)] for i in range(dim)]
-        return sp.linalg.block_diag(*linear_blocks) + np.block(quadratic_blocks)
+        P = self.precision_matrix
+        return np.diag(a @ P) + P.T @ B @ P
 
     def _get_dwave_bqm(self):
-        Q = self.qubo_matrix
-        size = len(Q)
-        linear = {i: Q[i, i] for i in range(size)}
-        quadratic = {(i, j): 2 * Q[i, j] for i in range(size) for j in range(i + 1, size)}
-        return dimod.BinaryQuadraticModel(linear, quadratic, vartype=dimod.BINARY)
+        # symmetric QUBO matrix: dimod sums (i,j) and (j,i) entries and skips zero couplings
+        return dimod.BinaryQuadraticModel(self.qubo_matrix, vartype=dimod.BINARY)
 
     def _decode_array(self, arr):
-        split_indices = np.cumsum(self.num_bits[:-1])
-        bitstrings_list = np.split(arr, indices_or_sections=split_indices)
-        decoded_arr = np.array([pvec @ bits for pvec, bits in zip(self.precision_vectors, bitstrings_list)])
-        return decoded_arr
+        return self.precision_matrix @ arr
 
     def _decode_matrix(self, mat):
-        split_indices = np.cumsum(self.num_bits[:-1])
-        rows = cols = np.split(np.arange(len(mat)), indices_or_sections=split_indices)
-        pvecs = self.precision_vectors
-        nbins = self.num_bins
-        decoded_mat = np.zeros(shape=(nbins, nbins))
-        for i in range(nbins):
-            for j in range(nbins):
-                block = mat[np.ix_(rows[i], cols[j])]
-                decoded_mat[i, j] = pvecs[i] @ block @ pvecs[j]
-        return decoded_mat
+        P = self.precision_matrix
+        return P @ mat @ P.T
 
     def _post_process_sampleset(self, sampleset):
         sampleset = SteepestDescentSolver().sample(self.dwave_bqm, initial_states=sampleset)
-        solutions = np.array([rec.sample for rec in sampleset.record])
-        energies = np.array([rec.energy for rec in sampleset.record])
+        solutions = sampleset.record.sample
+        energies = sampleset.record.energy
         if self.sol_pick == "mean":
             binsol = np.mean(solutions, axis=0)
             devs = solutions - binsol
@@ -135,31 +188,75 @@ class QUnfolder:
         sol = np.round(sol)
         return sol, cov
 
+    def _get_beta_range(self):
+        # vectorized dwave-samplers default: 50% worst-case flip probability when hot, 1% excitation rate when cold
+        h, (row, col, J), _ = self.dwave_bqm.spin.to_numpy_vectors()
+        abs_h, abs_J = np.abs(h), np.abs(J)
+        max_field = abs_h + np.bincount(row, weights=abs_J, minlength=len(h))
+        max_field += np.bincount(col, weights=abs_J, minlength=len(h))
+        min_field = np.where(abs_h > 0, abs_h, np.inf)
+        nonzero = abs_J > 0
+        np.minimum.at(min_field, row[nonzero], abs_J[nonzero])
+        np.minimum.at(min_field, col[nonzero], abs_J[nonzero])
+        min_field = min_field[np.isfinite(min_field)]
+        if len(min_field) == 0:
+            # all biases are zero: let the sampler apply its own fallback range
+            return None
+        num_min_gaps = np.sum(min_field == np.min(min_field))
+        hot_beta = np.log(2) / (2 * np.max(max_field))
+        cold_beta = np.log(num_min_gaps / 0.01) / (2 * np.min(min_field))
+        return [hot_beta, cold_beta]
+
     def _get_graph_embedding(self, **kwargs):
         source_edgelist = list(self.dwave_bqm.quadratic) + list((v, v) for v in self.dwave_bqm.linear)
         target_edgelist = self._sampler.edgelist
         return minorminer.find_embedding(S=source_edgelist, T=target_edgelist, **kwargs)
 
-    def _run_montecarlo_toys(self, num_toys, prog_bar, num_cores, **kwargs):
-        def run_toy(_):
-            smeared_d = np.random.poisson(self.d)
-            toy = QUnfolder(self.R, smeared_d, binning=self.binning, lam=self.lam)
+    def _get_toy(self, measured):
+        toy = QUnfolder(self.R, measured, binning=self.binning, lam=self.lam, encoding=self.encoding)
+        toy.__dict__.update({key: self.__dict__[key] for key in self._shared_cache if key in self.__dict__})
+        if not np.array_equal(toy.num_bits, self.num_bits):
             toy.initialize_qubo_model()
-            if isinstance(self._sampler, DWaveSampler):
-                embedding = toy._get_graph_embedding()
-                sampler = FixedEmbeddingComposite(self._sampler, embedding=embedding)
-            else:
-                sampler = self._sampler
-            sampleset = sampler.sample(toy.dwave_bqm, **kwargs)
-            sol, _ = toy._post_process_sampleset(sampleset)
-            return sol
+            return toy
+        # same encoding: only the linear coefficients depend on the measured histogram
+        delta = (toy.linear_coeffs - self.linear_coeffs) @ self.precision_matrix
+        toy.dwave_bqm = self.dwave_bqm.copy()
+        toy.dwave_bqm.add_linear_from_array(delta)
+        return toy
 
+    def _run_toy(self, toy_seed, **kwargs):
+        rng = np.random.default_rng(toy_seed)
+        smeared_d = rng.poisson(self.d)
+        toy = self._get_toy(measured=smeared_d)
+        if isinstance(self._sampler, DWaveSampler):
+            embedding = toy._get_graph_embedding()
+            sampler = FixedEmbeddingComposite(self._sampler, embedding=embedding)
+        else:
+            sampler = self._sampler
+            kwargs["seed"] = int(rng.integers(2**31))
+            if kwargs.get("beta_range") is None:
+                kwargs["beta_range"] = toy._get_beta_range()
+        sampleset = sampler.sample(toy.dwave_bqm, **kwargs)
+        sol, _ = toy._post_process_sampleset(sampleset)
+        return sol
+
+    def _run_montecarlo_toys(self, num_toys, prog_bar, num_cores, **kwargs):
+        toy_seeds = np.random.SeedSequence(kwargs.get("seed")).spawn(num_toys)
         max_workers = num_cores if num_cores is not None else os.cpu_count()
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            jobs = executor.map(run_toy, range(num_toys))
+        # local samplers are CPU-bound (GIL), remote QPU calls are I/O-bound
+        if isinstance(self._sampler, DWaveSampler):
+            run_toy = functools.partial(self._run_toy, **kwargs)
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+        else:
+            # each worker receives the unfolder once, tasks only carry their seed
+            run_toy = functools.partial(_run_toy_worker, **kwargs)
+            executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_toy_worker, initargs=(self,))
+        with executor:
+            jobs = executor.map(run_toy, toy_seeds)
             desc = "Running MC toys"
             disable = not prog_bar
-            results = list(tqdm(jobs, total=num_toys, desc=desc, disable=disable))
+            miniters = max(1, num_toys // 100)
+            results = list(tqdm(jobs, total=num_toys, desc=desc, disable=disable, mininterval=1.0, miniters=miniters))
         cov_toys = np.cov(results, rowvar=False)
         return cov_toys
 
@@ -167,18 +264,22 @@ class QUnfolder:
         self.qubo_matrix = self._get_qubo_matrix()
         self.dwave_bqm = self._get_dwave_bqm()
 
-    def solve_simulated_annealing(self, num_reads, num_toys=None, num_cores=None, seed=None):
+    def solve_simulated_annealing(
+        self, num_reads, num_toys=None, num_cores=None, seed=None, prog_bar=True, num_sweeps=1000, beta_range=None
+    ):
         self._sampler = SimulatedAnnealingSampler()
-        sampleset = self._sampler.sample(self.dwave_bqm, num_reads=num_reads, seed=seed)
+        sa_params = {"num_reads": num_reads, "num_sweeps": num_sweeps, "seed": seed}
+        betas = beta_range if beta_range is not None else self._get_beta_range()
+        sampleset = self._sampler.sample(self.dwave_bqm, beta_range=betas, **sa_params)
         sol, cov = self._post_process_sampleset(sampleset)
         if num_toys is not None:
-            cov_toys = self._run_montecarlo_toys(num_toys, num_cores, num_reads=num_reads, seed=seed)
-            cov += cov_toys
+            cov_toys = self._run_montecarlo_toys(num_toys, prog_bar, num_cores, beta_range=beta_range, **sa_params)
+            cov = cov + cov_toys
         return sol, cov
 
     def solve_hybrid_sampler(self):
         qm = ConstrainedQuadraticModel()
-        x = np.array([Integer(f"x{i}", upper_bound=2**nb - 1) for i, nb in enumerate(self.num_bits)])
+        x = np.array([Integer(f"x{i}", upper_bound=ub) for i, ub in enumerate(self.upper_bounds)])
         objective = (self.R @ x - self.d) @ (self.R @ x - self.d)
         if self.lam != 0:
             G = self._get_laplacian()
@@ -202,15 +303,17 @@ class QUnfolder:
         sol, cov = self._post_process_sampleset(sampleset)
         if num_toys is not None:
             cov_toys = self._run_montecarlo_toys(num_toys, prog_bar, num_cores, num_reads=num_reads)
-            cov += cov_toys
+            cov = cov + cov_toys
         return sol, cov
 
     def compute_energy(self, x):
-        xbin = []
         num_bits = self.num_bits
-        for i in range(self.num_bins):
-            bitstr = bin(int(x[i]))[2:].zfill(num_bits[i])
-            xbin.extend(map(int, bitstr[::-1]))
+        shifts = np.concatenate([np.arange(nb) for nb in num_bits])
+        xrep = np.repeat(np.asarray(x, dtype=np.int64), num_bits)
+        if self.encoding == "unary":
+            xbin = (shifts < xrep).astype(int)
+        else:
+            xbin = (xrep >> shifts) & 1
         energy = self.dwave_bqm.energy(sample=xbin)
         return energy
 
@@ -221,7 +324,7 @@ class QUnfolder:
             vtype = gurobipy.GRB.INTEGER
             sense = gurobipy.GRB.MINIMIZE
             model.setParam("OutputFlag", 0)
-            x = [model.addVar(vtype=vtype, lb=0, ub=2**b - 1) for b in self.num_bits]
+            x = [model.addVar(vtype=vtype, lb=0, ub=ub) for ub in self.upper_bounds]
             R, d = self.R, self.d
             objective = (R @ x - d) @ (R @ x - d)
             if self.lam != 0:
@@ -243,7 +346,6 @@ class QUnfolder:
             model.setObjective(x @ Q @ x, sense=sense)
             model.optimize()
             bitstr = np.array([var.x for var in x], dtype=int)
-            arrays = np.split(bitstr, np.cumsum(self.num_bits[:-1]))
-            sol = np.array([int("".join(arr.astype(str))[::-1], base=2) for arr in arrays], dtype=float)
+            sol = self._decode_array(arr=bitstr).astype(float)
             cov = np.diag(sol)
             return sol, cov
@@ -77,3 +77,23 @@ def TMatrix_to_numpy(matrix, dtype=np.float64):
     num_cols = matrix.GetNcols()
     array = np.array([[matrix[i][j] for j in range(num_cols)] for i in range(num_rows)])
     return array.astype(dtype=dtype)
+
+
+def TAxis_to_numpy(axis, dtype=np.float64):
+    """
+    Convert the bin edges of a ROOT.TAxis object into a 1D numpy array.
+
+    Args:
+        axis (ROOT.TAxis): the input TAxis to convert.
+        dtype (type): the data type of the output array.
+
+    Returns:
+        array (numpy.ndarray): the output 1D numpy array of bin edges.
+    """
+    num_bins = axis.GetNbins()
+    xbins = axis.GetXbins()
+    if xbins.GetSize():
+        array = np.frombuffer(xbins.GetArray(), dtype=np.float64, count=num_bins + 1)
+    else:
+        array = np.linspace(axis.GetXmin(), axis.GetXmax(), num_bins + 1)
+    return array.astype(dtype=dtype)
@@ -44,7 +44,7 @@ def approx_hessian(f, x):
 def lambda_optimizer(response, measured, truth, binning, num_reps=30, verbose=False, seed=None):
     if "gurobipy" not in sys.modules:
         raise ModuleNotFoundError("Function 'lambda_optimizer' requires Gurobi solver")
-    np.random.seed(seed)
+    rng = np.random.default_rng(seed)
 
     def objective_fun(lam):
         unfolder = QUnfolder(response, measured, binning=binning, lam=lam)
@@ -59,7 +59,7 @@ def lambda_optimizer(response, measured, truth, binning, num_reps=30, verbose=Fa
     min_fun = objective_fun(best_lam)
     options = {"xatol": 0, "maxiter": 100, "disp": 3 if verbose else 0}
     for _ in tqdm(range(num_reps), desc="Optimizing lambda"):
-        bounds = (0, np.random.rand())
+        bounds = (0, rng.random())
         minimizer = sp.optimize.minimize_scalar(fun=objective_fun, method="bounded", bounds=bounds, options=options)
         lam = minimizer.x
         fun = minimizer.fun
@@ -20,6 +20,7 @@ distributions = ["normal", "gamma", "exponential", "breit-wigner", "double-peake
 bias = -0.13
 smearing = 0.21
 eff = 0.7
+outdir = "studies/analysis"
 
 num_reads = 400
 num_toys = None
@@ -28,6 +29,8 @@ enable_quantum = False
 
 
 if __name__ == "__main__":
+    os.makedirs(outdir, exist_ok=True)
+
     for distr in distributions:
         print(f"Unfolding '{distr}' distribution...")
 
@@ -94,8 +97,5 @@ if __name__ == "__main__":
 
         fig = plot_comparison(solution, covariance, truth=truth, measured=measured, binning=binning, xlabel="Bins")
 
-        dirpath = "studies/analysis"
-        if not os.path.exists(dirpath):
-            os.makedirs(dirpath)
         fig.tight_layout()
-        fig.savefig(f"{dirpath}/{distr}.pdf")
+        fig.savefig(f"{outdir}/{distr}.pdf")
@@ -1,7 +1,7 @@
 import os
 import ROOT
 import numpy as np
-from qunfold.root2numpy import TH1_to_numpy, TH2_to_numpy
+from qunfold.root2numpy import TH1_to_numpy, TH2_to_numpy, TAxis_to_numpy
 from qunfold.utils import normalize_response, lambda_optimizer
 from unfolder import run_RooUnfold, run_QUnfold
 from comparison import plot_comparison
@@ -14,6 +14,7 @@ dirpath = "studies/data/"
 rootfile = "unfolding_input.root"
 reco_tree = "reco"
 particle_tree = "particle"
+outdir = "studies/paper_acat"
 
 var2label = {
     "pT_lep1": r"$P_T^{lep_1}$ [GeV]",
@@ -35,6 +36,7 @@ if __name__ == "__main__":
     file = ROOT.TFile(f"{dirpath}{rootfile}", "READ")
     reco = file.Get(reco_tree)
     particle = file.Get(particle_tree)
+    os.makedirs(outdir, exist_ok=True)
 
     for var in var2label:
         print(f"Unfolding '{var}' variable...")
@@ -45,10 +47,8 @@ if __name__ == "__main__":
         th1_measured = reco.Get(var)
         th1_truth = particle.Get(f"particle_{var}")
 
-        bins = th1_measured.GetNbinsX()
-        xaxis = th1_measured.GetXaxis()
-        bin_edges = [xaxis.GetBinLowEdge(bin) for bin in range(1, bins + 2)]
-        binning = np.array([-np.inf] + bin_edges + [np.inf])
+        bin_edges = TAxis_to_numpy(th1_measured.GetXaxis())
+        binning = np.concatenate(([-np.inf], bin_edges, [np.inf]))
 
         ######################### RooUnfold #########################
         roounfold_response = ROOT.RooUnfoldResponse(th1_measured_mc, th1_truth_mc, th2_response)
@@ -111,8 +111,5 @@ if __name__ == "__main__":
             solution, covariance, truth=truth, measured=measured, binning=binning, xlabel=var2label[var]
         )
 
-        dirpath = "studies/paper_acat"
-        if not os.path.exists(dirpath):
-            os.makedirs(dirpath)
         fig.tight_layout()
-        fig.savefig(f"{dirpath}/{var}.pdf")
+        fig.savefig(f"{outdir}/{var}.pdf")
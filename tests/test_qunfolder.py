@@ -0,0 +1,87 @@
+import pytest
+import numpy as np
+from hypothesis import settings, given
+from hypothesis import strategies as st
+from qunfold import QUnfolder
+
+
+dim = st.integers(min_value=4, max_value=10)
+lam = st.floats(min_value=0.0, max_value=1.0)
+seed = st.integers(min_value=0, max_value=2**32 - 1)
+encoding = st.sampled_from(["binary", "unary"])
+
+
+def random_problem(dim, seed):
+    rng = np.random.default_rng(seed)
+    response = rng.random(size=(dim, dim)) + np.eye(dim)
+    response /= np.sum(response, axis=0)
+    measured = rng.integers(low=0, high=200, size=dim).astype(float)
+    binning = np.sort(rng.uniform(low=0.0, high=10.0, size=dim + 1))
+    return response, measured, binning
+
+
+@settings(deadline=None, max_examples=25)
+@given(dim=dim, lam=lam, seed=seed, encoding=encoding)
+def test_compute_energy(dim, lam, seed, encoding):
+    response, measured, binning = random_problem(dim, seed)
+    unfolder = QUnfolder(response, measured, binning=binning, lam=lam, encoding=encoding)
+    unfolder.initialize_qubo_model()
+    x = np.random.default_rng(seed).integers(low=0, high=np.array(unfolder.upper_bounds) + 1)
+    G = unfolder._get_laplacian()
+    objective = (response @ x - measured) @ (response @ x - measured) + lam * (G @ x) @ (G @ x)
+    assert np.isclose(unfolder.compute_energy(x), objective - measured @ measured)
+
+
+def test_montecarlo_toys_reproducible():
+    response, measured, binning = random_problem(dim=6, seed=0)
+    covs = []
+    for _ in range(2):
+        unfolder = QUnfolder(response, measured, binning=binning, lam=0.1)
+        unfolder.initialize_qubo_model()
+        _, cov = unfolder.solve_simulated_annealing(num_reads=10, num_toys=4, prog_bar=False, num_cores=2, seed=42)
+        covs.append(cov)
+    assert np.allclose(covs[0], covs[1])
+
+
+@settings(deadline=None, max_examples=25)
+@given(dim=dim, lam=lam, seed=seed)
+def test_toy_qubo_model(dim, lam, seed):
+    response, measured, binning = random_problem(dim, seed)
+    unfolder = QUnfolder(response, measured, binning=binning, lam=lam)
+    unfolder.initialize_qubo_model()
+    smeared = np.random.default_rng(seed).poisson(measured)
+    toy = unfolder._get_toy(measured=smeared)
+    ref = QUnfolder(response, smeared, binning=binning, lam=lam)
+    ref.initialize_qubo_model()
+    toy_linear, (_, _, toy_quadratic), _ = toy.dwave_bqm.to_numpy_vectors()
+    ref_linear, (_, _, ref_quadratic), _ = ref.dwave_bqm.to_numpy_vectors()
+    assert np.allclose(toy_linear, ref_linear)
+    assert np.allclose(np.sort(toy_quadratic), np.sort(ref_quadratic))
+    x = np.random.default_rng(seed).integers(low=0, high=2, size=(10, ref.num_logical_qubits))
+    assert np.allclose(toy.dwave_bqm.energies(x), ref.dwave_bqm.energies(x))
+
+
+def test_reassign_response_and_binning():
+    response, measured, binning = random_problem(dim=6, seed=0)
+    new_response, _, new_binning = random_problem(dim=6, seed=1)
+    unfolder = QUnfolder(response, measured, binning=binning, lam=0.1)
+    unfolder.initialize_qubo_model()
+    unfolder.R = new_response
+    unfolder.binning = new_binning
+    unfolder.initialize_qubo_model()
+    ref = QUnfolder(new_response, measured, binning=new_binning, lam=0.1)
+    ref.initialize_qubo_model()
+    assert np.array_equal(unfolder.num_bits, ref.num_bits)
+    assert np.allclose(unfolder.quadratic_coeffs, ref.quadratic_coeffs)
+    assert np.allclose(unfolder.qubo_matrix, ref.qubo_matrix)
+
+
+def test_beta_range_null_problem():
+    dim = 4
+    binning = np.linspace(0.0, 1.0, dim + 1)
+    unfolder = QUnfolder(np.zeros(shape=(dim, dim)), np.zeros(dim), binning=binning)
+    unfolder.initialize_qubo_model()
+    assert unfolder._get_beta_range() is None
+    with pytest.warns(UserWarning, match="biases are zero"):
+        sol, _ = unfolder.solve_simulated_annealing(num_reads=10, seed=0)
+    assert len(sol) == dim